@@ -1,5 +1,5 @@
 import sys
-import copy
+from collections import deque
 
 from crossword import *
 
@@ -15,6 +15,18 @@ class CrosswordCreator():
             var: self.crossword.words.copy()
             for var in self.crossword.variables
         }
+        self._by_len = {}  # Words of the vocabulary grouped by their length
+        for word in self.crossword.words:
+            self._by_len.setdefault(len(word), set()).add(word)
+        self._support = {}  # Cached support buckets with the domain they were built from, see `support`
+        self._neighbors = {  # Neighbours of every variable, the structure never changes
+            var: frozenset(self.crossword.neighbors(var))
+            for var in self.crossword.variables
+        }
+        self._degree = {  # No.of neighbours of every variable
+            var: len(self._neighbors[var])
+            for var in self.crossword.variables
+        }
 
     def letter_grid(self, assignment):
         """
@@ -92,7 +104,7 @@ class CrosswordCreator():
         """
         self.enforce_node_consistency()
         self.ac3()
-        return self.backtrack(dict())
+        return self.backtrack(dict(), set(self.domains))
 
     def enforce_node_consistency(self):
         """
@@ -100,13 +112,58 @@ class CrosswordCreator():
         (Remove any values that are inconsistent with a variable's unary
          constraints; in this case, the length of the word.)
         """
-        deepcopy_domain = copy.deepcopy(self.domains)
         for var in self.domains:  # Checking every variable in domain
-            leng = var.length  
-            for words in deepcopy_domain[var]:  # Checking whether the words and the variable are same length
+            self.domains[var] = set(self._by_len.get(var.length, ()))  # Only the words with the same length as the variable are kept
+        self._support.clear()  # Every domain changed, so all the buckets are outdated
 
-                if len(words) != leng:
-                    self.domains[var].remove(words)  # If there are not the same length it will removed from the domain
+    def support(self, var, index):
+        """
+        Return a dictionary mapping each character to the set of words in
+        `self.domains[var]` having that character at position `index`.
+        Buckets are built lazily and cached together with the domain they
+        were built from, so they are rebuilt whenever `self.domains[var]` is
+        replaced or changes size.
+        """
+        domain = self.domains[var]
+        cached = self._support.get(var)
+        if cached is None or cached[0] is not domain or cached[1] != len(domain):
+            cached = (domain, len(domain), {})  # Outdated (or no) buckets, start again
+            self._support[var] = cached
+        buckets = cached[2]
+        if index not in buckets:
+            bucket = {}
+            for word in self.domains[var]:
+                bucket.setdefault(word[index], set()).add(word)
+            buckets[index] = bucket
+        return buckets[index]
+
+    def discard_support(self, var, words):
+        """
+        Update the cached support buckets of `var` after `words` were
+        removed from its domain, dropping characters no word has anymore.
+        Buckets are replaced rather than changed in place, so earlier
+        copies of `self._support` stay valid.
+        """
+        domain = self.domains[var]
+        cached = self._support.pop(var, None)
+        if cached is None or cached[0] is not domain or cached[1] != len(domain) + len(words):
+            return  # Buckets were already outdated, `support` rebuilds them
+
+        buckets = {}
+        for index, bucket in cached[2].items():
+            removed = {}  # Removed words grouped by their character at `index`
+            for word in words:
+                removed.setdefault(word[index], set()).add(word)
+
+            bucket = bucket.copy()
+            for char, char_words in removed.items():
+                remaining = bucket[char] - char_words
+                if remaining:
+                    bucket[char] = remaining
+                else:
+                    del bucket[char]  # No word of the domain has that character anymore
+            buckets[index] = bucket
+        self._support[var] = (domain, len(domain), buckets)
 
     def revise(self, x, y):
         """
@@ -117,22 +174,17 @@ class CrosswordCreator():
         False if no revision was made.
         """
         overlap_x, overlap_y = self.crossword.overlaps[x, y]  # Assigning overlapping cells to vaariables
-        revision = False  # Revision status
-        copy_domain = copy.deepcopy(self.domains)  # Deep copy of Domain
-
-        if overlap_x:  # If overlap happens
-            for word_x in copy_domain[x]:
-                match = False  # Initiliaze a variable to check if math is found or not
-                for word_y in self.domains[y]:
-                    if word_x[overlap_x] == word_y[overlap_y]:
-                        match = True  # If a match has been found it return True
-                        break
-                if match:
-                    continue  # Iterates through X's domain again
-                else:
-                    self.domains[x].remove(word_x)  # If there isn't a match then it will that word from X's domain
-                    revision = True  # And returns True
+        to_remove = set()  # Words of X's domain without a match in Y's domain
+        bucket_x = self.support(x, overlap_x)  # X's words grouped by their overlapping character
+        bucket_y = self.support(y, overlap_y)  # Y's words grouped by their overlapping character
+
+        for char in bucket_x.keys() - bucket_y.keys():
+            to_remove |= bucket_x[char]  # If no word of Y has that character, all these words are removed from X's domain
 
+        if to_remove:
+            self.domains[x].difference_update(to_remove)  # Removes all the unmatched words at once
+            self.discard_support(x, to_remove)  # Keeps X's buckets matching its domain
+        revision = bool(to_remove)  # Revision status
         return revision
 
     def ac3(self, arcs=None):
@@ -143,22 +195,24 @@ class CrosswordCreator():
         Return True if arc consistency is enforced and no domains are empty;
         return False if one or more domains end up empty.
         """
-        if not arcs:
-            queue = [] 
+        if arcs is None:
+            queue = deque()
             for var1 in self.domains:
-                for var2 in self.crossword.neighbors(var1):
+                for var2 in self._neighbors[var1]:
                     if self.crossword.overlaps[var1, var2] is not None:
                         queue.append((var1, var2))  # Populate the queue with all the arcs
+        else:
+            queue = deque(arcs)  # Start with the arcs that were given
 
         while len(queue) > 0:
-            x, y = queue.pop(0)
+            x, y = queue.popleft()
             if self.revise(x, y):
                 if len(self.domains[x]) == 0:
                     return False
-                for neighbour in self.crossword.neighbors(x):
+                for neighbour in self._neighbors[x]:
                     if neighbour != y:
                         queue.append((neighbour, x))
-            return True
+        return True
 
     def assignment_complete(self, assignment):
         """
@@ -184,7 +238,7 @@ class CrosswordCreator():
                 return False
 
         for var in assignment:
-            for n in self.crossword.neighbors(var):
+            for n in self._neighbors[var]:
                 if n in assignment:
                     x, y = self.crossword.overlaps[var, n]         # Checks any conflicts between the neighbouring variables
                     if assignment[var][x] != assignment[n][y]:
@@ -192,6 +246,28 @@ class CrosswordCreator():
 
         return True
 
+    def consistent_add(self, assignment, var):
+        """
+        Return True if `assignment` is consistent, given that it was
+        consistent before `var` was added to it; return False otherwise.
+        Only the constraints involving `var` are checked.
+        """
+        word = assignment[var]
+        if var.length != len(word):  # Checking whether it is the correct length
+            return False
+
+        for other in assignment:
+            if other != var and assignment[other] == word:
+                return False  # Check if the value is different from the others
+
+        for n in self._neighbors[var]:
+            if n in assignment:
+                x, y = self.crossword.overlaps[var, n]  # Checks any conflicts with the neighbouring variables
+                if word[x] != assignment[n][y]:
+                    return False
+
+        return True
+
     def order_domain_values(self, var, assignment):
         """
         Return a list of values in the domain of `var`, in order by
@@ -200,7 +276,7 @@ class CrosswordCreator():
         that rules out the fewest values among the neighbors of `var`.
         """
         DictWord = {}  # Initiliaze a dictionary
-        neighbours = self.crossword.neighbors(var)  # Takes the neighbours
+        neighbours = self._neighbors[var]  # Takes the neighbours
         for words in self.domains[var]:
             removed = 0
             for n in neighbours:
@@ -208,52 +284,73 @@ class CrosswordCreator():
                     continue
                 else:
                     overlap_x, overlap_y = self.crossword.overlaps[var, n]  # Checks if the neighbour and word overlaps
-                    for n_word in self.domains[n]:  
-                        if words[overlap_x] != n_word[overlap_y]:  # Loops through neighbour's words and checks for eliminated ones
-                            removed = removed + 1 
+                    bucket = self.support(n, overlap_y)  # Neighbour's words grouped by their overlapping character
+                    removed += len(self.domains[n]) - len(bucket.get(words[overlap_x], ()))  # Neighbour's words that don't match are eliminated
             DictWord[words] = removed
-            # Variables sorted in dictionary by the no.of eliminated neighbour values
-            sorted_l = {k: v for k, v in sorted(DictWord.items(), key=lambda item: item[1])}
-            return [*sorted_l]
 
-    def select_unassigned_variable(self, assignment):
+        # Words sorted by the no.of eliminated neighbour values
+        return sorted(self.domains[var], key=lambda word: DictWord[word])
+
+    def select_unassigned_variable(self, assignment, unassigned=None):
         """
         Return an unassigned variable not already part of `assignment`.
         Choose the variable with the minimum number of remaining values
         in its domain. If there is a tie, choose the variable with the highest
         degree. If there is a tie, any of the tied variables are acceptable
         return values.
+        If given, `unassigned` is the set of variables not in `assignment`.
         """
+        if unassigned is None:
+            unassigned = (var for var in self.domains if var not in assignment)
 
-        unassign_var = {}  # Initiliaze a dictionary
-
-        for var in self.domains:
-            if var not in assignment:  # If a variable is not assignment 
-                unassign_var[var] = self.domains[var]  # It becomes a part of our dict
-
-          # Creates a list of variables sorted by no.of remaining values    
-        sorted_l = [v for v, k in sorted(unassign_var.items(), key=lambda item:len(item[1]))]
-        return sorted_l[0] 
+        # Fewest remaining values first, then the highest degree
+        return min(
+            unassigned,
+            key=lambda var: (len(self.domains[var]), -self._degree[var])
+        )
 
-    def backtrack(self, assignment):
+    def backtrack(self, assignment, unassigned=None):
         """
         Using Backtracking Search, take as input a partial assignment for the
         crossword and return a complete assignment if possible to do so.
         `assignment` is a mapping from variables (keys) to words (values).
+        `unassigned` is the set of variables not yet in `assignment`.
         If no assignment is possible, return None.
         """
-        if len(assignment) == len(self.domains):  # If assigment is done
+        if unassigned is None:
+            unassigned = set(self.domains) - set(assignment)
+
+        if not unassigned:  # If assigment is done
             return assignment
 
-        var = self.select_unassigned_variable(assignment)  # Select a unassigned variable
+        var = self.select_unassigned_variable(assignment, unassigned)  # Select a unassigned variable
+        unassigned.remove(var)
 
-        for value in self.domains[var]:  # Looping over words in that variable
+        for value in self.order_domain_values(var, assignment):  # Looping over words in that variable, least constraining first
             copy_assign = assignment.copy()  # Assignment copy with the new variable value
             copy_assign[var] = value
-            if self.consistent(copy_assign):  # Checks for consistency
-                result = self.backtrack(copy_assign)  # Result of the new assignment backtrack
-                if result is not None:
-                    return result
+            if self.consistent_add(copy_assign, var):  # Checks for consistency of the new variable
+                old_domains = self.domains  # Domains before the inference, the search works on copies
+                self.domains = {v: words.copy() for v, words in old_domains.items()}
+                old_support = self._support
+                self._support = {  # Same buckets, now matching the copied domains
+                    v: (self.domains[v], size, buckets)
+                    for v, (domain, size, buckets) in old_support.items()
+                    if domain is old_domains[v] and size == len(domain)
+                }
+                self.domains[var] = {value}  # The variable can only take the assigned value now
+                self._support.pop(var, None)
+
+                # Makes the neighbours arc consistent with the new value
+                if self.ac3(arcs=[(n, var) for n in self._neighbors[var]]):
+                    result = self.backtrack(copy_assign, unassigned)  # Result of the new assignment backtrack
+                    if result is not None:
+                        return result
+
+                self.domains = old_domains  # Undoes the inference before trying the next value
+                self._support = old_support
+
+        unassigned.add(var)  # No value worked, so the variable is unassigned again
         return None
 
 
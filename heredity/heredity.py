@@ -38,6 +38,28 @@ PROBS = {
     "mutation": 0.01
 }
 
+# Probability of a parent passing the gene on, indexed by the parent's
+# number of copies of the gene
+PASS_GENE = [
+    PROBS["mutation"],
+    0.5,
+    1 - PROBS["mutation"]
+]
+
+# Probability of a child having 0, 1 or 2 copies of the gene, indexed by
+# the mother's and the father's number of copies of the gene
+CHILD_GENE = [
+    [
+        [
+            (1 - PASS_GENE[mom]) * (1 - PASS_GENE[dad]),
+            (1 - PASS_GENE[mom]) * PASS_GENE[dad] + PASS_GENE[mom] * (1 - PASS_GENE[dad]),
+            PASS_GENE[mom] * PASS_GENE[dad]
+        ]
+        for dad in range(3)
+    ]
+    for mom in range(3)
+]
+
 
 def main():
 
@@ -62,26 +84,47 @@ def main():
         for person in people
     }
 
+    # Sets of people are bitmasks, where bit i stands for names[i]
+    names, mother, father = people_arrays(people)
+    everyone = (1 << len(names)) - 1
+
+    # Known information as a mask of people with a known trait, and
+    # the bits those people must have set in `have_trait`
+    trait_known = 0
+    trait_value = 0
+    for i, person in enumerate(names):
+        if people[person]["trait"] is not None:
+            trait_known |= 1 << i
+            if people[person]["trait"]:
+                trait_value |= 1 << i
+
     # Loop over all sets of people who might have the trait
-    names = set(people)
-    for have_trait in powerset(names):
+    for have_trait in range(everyone + 1):
 
         # Check if current set of people violates known information
-        fails_evidence = any(
-            (people[person]["trait"] is not None and
-             people[person]["trait"] != (person in have_trait))
-            for person in names
-        )
-        if fails_evidence:
+        if have_trait & trait_known != trait_value:
             continue
+        traits = [bool(have_trait >> i & 1) for i in range(len(names))]
 
         # Loop over all sets of people who might have the gene
-        for one_gene in powerset(names):
-            for two_genes in powerset(names - one_gene):
+        for one_gene in range(everyone + 1):
+            no_one_gene = everyone & ~one_gene
+
+            # Loop over every subset of the people without one gene
+            two_genes = no_one_gene
+            while True:
 
                 # Update probabilities with new joint probability
-                p = joint_probability(people, one_gene, two_genes, have_trait)
-                update(probabilities, one_gene, two_genes, have_trait, p)
+                genes = [
+                    (one_gene >> i & 1) + 2 * (two_genes >> i & 1)
+                    for i in range(len(names))
+                ]
+                p = joint_probability_arrays(genes, traits, mother, father)
+                update_arrays(probabilities, names, genes, traits, p)
+
+                if two_genes == 0:
+                    break
+                two_genes = (two_genes - 1) & no_one_gene
 
     # Ensure probabilities sum to 1
     normalize(probabilities)
@@ -130,6 +173,23 @@ def powerset(s):
     ]
 
 
+def people_arrays(people):
+    """
+    Return `people` as parallel lists `(names, mother, father)`.
+    `names` lists every person, and `mother[i]` and `father[i]` are the
+    indexes in `names` of the parents of `names[i]`, or -1 if unknown.
+    """
+    names = list(people)
+    index = {name: i for i, name in enumerate(names)}
+    mother = []
+    father = []
+    for name in names:
+        person = people[name]
+        mother.append(index.get(person["mother"], -1))
+        father.append(index.get(person["father"], -1))
+    return names, mother, father
+
+
 def joint_probability(people, one_gene, two_genes, have_trait):
     """
     Compute and return a joint probability.
@@ -141,47 +201,39 @@ def joint_probability(people, one_gene, two_genes, have_trait):
         * everyone in set `have_trait` has the trait, and
         * everyone not in set` have_trait` does not have the trait.
     """
+    names, mother, father = people_arrays(people)
+    genes = [
+        1 if human in one_gene else 2 if human in two_genes else 0
+        for human in names
+    ]  # Checking the number of genes a person have
+    traits = [human in have_trait for human in names]  # Checking if a person has the trait
+    return joint_probability_arrays(genes, traits, mother, father)
+
+
+def joint_probability_arrays(genes, traits, mother, father):
+    """
+    Compute and return a joint probability, like `joint_probability`, for
+    people given as parallel lists (see `people_arrays`).
+    `genes[i]` is the number of copies of the gene person `i` has, and
+    `traits[i]` is whether person `i` has the trait.
+    """
     Probability = 1
+    gene_probs = PROBS['gene']  # Looked up once instead of for every person
+    trait_probs = PROBS['trait']
 
-    for human in people:
-        if human in one_gene:  # Checking the number of genes a person have
-            genes = 1
-        elif human in two_genes:
-            genes = 2
-        else:
-            genes = 0
-        if human in have_trait:  # Checking if a person has the trait
-            trait = True
-        else:
-            trait = False
+    for human in range(len(genes)):
+        gene = genes[human]
+        trait = traits[human]
 
-        prob_of_gene = PROBS['gene'][genes]  # Caluclating the probabilty of having that gene
-        prob_of_trait = PROBS['trait'][genes][trait]  # Caluclating the probabilty of having that trait
+        prob_of_gene = gene_probs[gene]  # Caluclating the probabilty of having that gene
+        prob_of_trait = trait_probs[gene][trait]  # Caluclating the probabilty of having that trait
 
-        if people[human]["father"] is None:  # Checking whether the parents are registered
+        if father[human] == -1:  # Checking whether the parents are registered
             Probability *= prob_of_gene * prob_of_trait
         else:  # If parents are registered
-            mom = people[human]["mother"]
-            dad = people[human]["father"]
-            percentage_of = {}
-
-            for parents in [mom, dad]:
-                if parents in one_gene:  # Caluclating the probability of the parents genes 
-                    percentage = (0.5 * (1 - PROBS['mutation'])) + (0.5 * PROBS['mutation'])
-                elif parents in two_genes:
-                    percentage = 1 - PROBS['mutation']
-                else:
-                    percentage = 0 + PROBS['mutation'] 
-                percentage_of[parents] = percentage  # Stores the probability of parents
-
-            if genes == 0:  # Caluclating the pb given the parents percentage
-                Probability *= (1 - percentage_of[mom]) * (1 - percentage_of[dad])
-            elif genes == 1:
-                Probability *= (1 - percentage_of[mom]) * percentage_of[dad] + percentage_of[mom] * (1 - percentage_of[dad])
-            else:
-                Probability *= percentage_of[mom] * percentage_of[dad]
-
-            Probability *= prob_of_trait
+            mom = genes[mother[human]] if mother[human] != -1 else 0  # An unknown parent counts as having no copies
+            dad = genes[father[human]]
+            Probability *= CHILD_GENE[mom][dad][gene] * prob_of_trait  # Caluclating the pb given the parents genes
     return Probability
 
 
@@ -209,20 +261,28 @@ def update(probabilities, one_gene, two_genes, have_trait, p):
         probabilities[human]["trait"][trait] = probabilities[human]["trait"][trait] + p  # Adds the new joint probability
 
 
+def update_arrays(probabilities, names, genes, traits, p):
+    """
+    Add to `probabilities` a new joint probability `p`, like `update`, for
+    people given as parallel lists (see `joint_probability_arrays`).
+    """
+    for human in range(len(names)):
+        distribution = probabilities[names[human]]
+        distribution["gene"][genes[human]] += p
+        distribution["trait"][traits[human]] += p  # Adds the new joint probability
+
+
 def normalize(probabilities):
     """
     Update `probabilities` such that each probability distribution
     is normalized (i.e., sums to 1, with relative proportions the same).
     """
-    normal = probabilities.copy()
     for human in probabilities:
         for type in ['gene', 'trait']:
-            sum_total = sum(probabilities[human][type].values())
-            for category in probabilities[human][type]:
-                val = probabilities[human][type][category]
-                normalized_value = val / sum_total
-                normal[human][type][category] = normalized_value  # Noramlizes the distribution's value
-    return normal
+            distribution = probabilities[human][type]
+            sum_total = sum(distribution.values())
+            for category in distribution:
+                distribution[category] /= sum_total  # Noramlizes the distribution's value in place
 
 
 if __name__ == "__main__":
@@ -1,6 +1,5 @@
 import itertools
 import random
-import copy
 
 
 class Minesweeper():
@@ -102,26 +101,21 @@ class Sentence():
     def __str__(self):
         return f"{self.cells} = {self.count}"
 
-    def known_mines(self):
-        """
-        Returns the set of all cells in self.cells known to be mines.
-        """
-        if self.count == len(self.cells):
-            return self.cells
-
     def known_mines(self):
         """
         Returns the set of all cells in self.cells known to be mines.
         """
         if self.count == len(self.cells):  # if the count/number(mines) is equal to the cells then we know they are mines
-            return self.cells
+            return frozenset(self.cells)  # A snapshot, so marking cells while iterating over it is safe
+        return frozenset()
 
     def known_safes(self):
         """
         Returns the set of all cells in self.cells known to be safe.
         """
         if self.count == 0:  # If the count/number is equal 0 then they are known as safes
-            return self.cells
+            return frozenset(self.cells)  # A snapshot, so marking cells while iterating over it is safe
+        return frozenset()
 
     def mark_mine(self, cell):
         """
@@ -165,6 +159,9 @@ class MinesweeperAI():
         # List of sentences about the game known to be true
         self.knowledge = []
 
+        # (cells, count) of every sentence in the knowledge, None when outdated
+        self._seen = set()
+
     def mark_mine(self, cell):
         """
         Marks a cell as a mine, and updates all knowledge
@@ -173,6 +170,7 @@ class MinesweeperAI():
         self.mines.add(cell)
         for sentence in self.knowledge:
             sentence.mark_mine(cell)
+        self._seen = None  # Sentences may have changed
 
     def mark_safe(self, cell):
         """
@@ -182,6 +180,7 @@ class MinesweeperAI():
         self.safes.add(cell)
         for sentence in self.knowledge:
             sentence.mark_safe(cell)
+        self._seen = None  # Sentences may have changed
 
     def add_knowledge(self, cell, count):
         """
@@ -207,7 +206,7 @@ class MinesweeperAI():
 
 
         cells = set()  # Creating a set to add unknown states
-        count_copy = copy.deepcopy(count)  # Creating a deep copy of count/mines
+        count_copy = count  # Count of mines among the unknown cells
         close_cells = self.neighbour(cell)  # Returns the neighbouring cells
         for a_cell in close_cells:  # For a cell in Neighbouring cell
             if a_cell in self.mines:  # If it is mines
@@ -217,56 +216,103 @@ class MinesweeperAI():
 
         new_sentence = Sentence(cells, count_copy)  # Create new sentence by using the new cells and count copy
 
-        if len(new_sentence.cells) > 0:  # Only add the new sentence to our knowledge,if it is not empty
-            self.knowledge.append(new_sentence)  # Appending the new sentence to our knowledge base
+        self.add_sentence(new_sentence)  # Appending the new sentence to our knowledge base
 
         self.check_knowledge()  # Calling our knowledge function
 
         self.extra_inference()  # Calling our inference function
 
+    def add_sentence(self, sentence):
+        """
+        adds sentence to knowledge without the cells already known to be
+        mines or safes, unless it is empty or already in the knowledge
+        """
+        for mine in sentence.cells & self.mines:
+            sentence.mark_mine(mine)
+        for safe in sentence.cells & self.safes:
+            sentence.mark_safe(safe)
+
+        if self._seen is None:
+            self.prune_knowledge()
+
+        key = (frozenset(sentence.cells), sentence.count)
+        if not sentence.cells or key in self._seen:  # Only add the sentence to our knowledge if it is not empty or a duplicate
+            return
+        self._seen.add(key)
+        self.knowledge.append(sentence)
+
+    def prune_knowledge(self):
+        """
+        removes empty and duplicate sentences from knowledge, and records
+        the (cells, count) of the sentences that are kept
+        """
+        self._seen = set()
+        kept = []
+        for sentence in self.knowledge:
+            key = (frozenset(sentence.cells), sentence.count)
+            if sentence.cells and key not in self._seen:
+                self._seen.add(key)
+                kept.append(sentence)
+        self.knowledge = kept
+
     def neighbour(self, cell):  # Gives out the cells close to the given cell by 1 cell
         """
         returns cell that are 1 cell away from cell passed in arg
         """
-        neighbours = set()
-        for rows in range(self.height):
-            for columns in range(self.width):  # For each cell
-                if abs(cell[0] - rows) <= 1 and abs(cell[1] - columns) <= 1 and (rows, columns) != cell:  # Figures out the neighbours
-                    neighbours.add((rows, columns))  # Add the neighbour cells to the set
-        return neighbours
+        return {
+            (rows, columns)
+            for rows in range(cell[0] - 1, cell[0] + 2)
+            for columns in range(cell[1] - 1, cell[1] + 2)  # Only the cells within one row and column
+            if (rows, columns) != cell and 0 <= rows < self.height and 0 <= columns < self.width
+        }
 
     def check_knowledge(self):
         """
         check knowledge for new safes and mines, updates knowledge if possible
         """
-        knowledge_copy = copy.deepcopy(self.knowledge)  # Making a deep copy of our knowledge
-
-        for sentence in knowledge_copy:  # Loops through every sentence from our knowledge copy
-            if len(sentence.cells) == 0:
-                try:
-                    self.knowledge.remove(sentence)  # If the sentence contains nothing then it will remove it from our knowledge base
-                except ValueError:
-                    pass
-
-            mines = sentence.known_mines()  # Checks for possible mines
-            safes = sentence.known_safes()  # Checks for possible safes
-
-            if mines:
-                for mine in mines:
-                    self.mark_mine(mine)  # Marking it as mine
-                    self.check_knowledge()  # Checking the knowledge with updated knowledge/mine
-            if safes:
-                for safe in safes:
-                    self.mark_safe(safe)  # Marking it as safe
-                    self.check_knowledge()  # Checking the knowledge with updated knowledge/safe
+        changed = True
+        while changed:  # Repeats until no new mines or safes are found
+            changed = False
+
+            # Removes the sentences that contain nothing or are duplicates from our knowledge base
+            self.prune_knowledge()
+
+            mines = set()
+            safes = set()
+            for sentence in self.knowledge:  # Loops through every sentence from our knowledge
+                known = sentence.known_mines()  # Checks for possible mines
+                if known:
+                    mines |= known
+                known = sentence.known_safes()  # Checks for possible safes
+                if known:
+                    safes |= known
+
+            for mine in mines - self.mines:
+                self.mark_mine(mine)  # Marking it as mine
+                changed = True
+            for safe in safes - self.safes:
+                self.mark_safe(safe)  # Marking it as safe
+                changed = True
 
     def extra_inference(self):
         """
         update knowledge based on inference
         """
+        cell_sentences = {}  # Sentences of our knowledge that contain each cell
+        for sentence in self.knowledge:
+            for a_cell in sentence.cells:
+                cell_sentences.setdefault(a_cell, []).append(sentence)
+
+        inferred = []  # New sentences, added once all pairs have been checked
         for sen1 in self.knowledge:
-            for sen2 in self.knowledge:  # Looping over pairs of sentences
-                if sen1.cells.issubset(sen2.cells):  # Checking if a sentence is subset of another
+            candidates = {}  # Only the sentences sharing a cell with sen1 can contain it
+            for a_cell in sen1.cells:
+                for sen2 in cell_sentences[a_cell]:
+                    if sen2 is not sen1:
+                        candidates[id(sen2)] = sen2
+
+            for sen2 in candidates.values():  # Looping over pairs of sentences
+                if sen1.cells < sen2.cells:  # Checking if a sentence is subset of another
                     cells_now = sen2.cells - sen1.cells  # If it is subset then cells in a new set is cells which are not in the subset
                     count_now = sen2.count - sen1.count  # If it is subset then count/mines in a new set is count/mines which are not in the subset
                     new_sentence = Sentence(cells_now, count_now)  # New sentence consists of new_cells and new_count
@@ -280,6 +326,11 @@ class MinesweeperAI():
                         for safe in safes:
                             self.mark_safe(safe)  # Marking it as safe
 
+                    inferred.append(new_sentence)
+
+        for sentence in inferred:
+            self.add_sentence(sentence)
+
     def make_safe_move(self):
         """
         Returns a safe cell to choose on the Minesweeper board.
@@ -1,11 +1,17 @@
+import bisect
+import itertools
 import os
 import random
 import re
 import sys
+from array import array
 
 DAMPING = 0.85
 SAMPLES = 10000
 
+# Matches the target of every link in an HTML page, as bytes
+LINK_RE = re.compile(rb"<a\s+(?:[^>]*?)href=\"([^\"]*)\"", re.IGNORECASE)
+
 
 def main():
     if len(sys.argv) != 2:
@@ -33,17 +39,15 @@ def crawl(directory):
     for filename in os.listdir(directory):
         if not filename.endswith(".html"):
             continue
-        with open(os.path.join(directory, filename)) as f:
-            contents = f.read()
-            links = re.findall(r"<a\s+(?:[^>]*?)href=\"([^\"]*)\"", contents)
+        with open(os.path.join(directory, filename), "rb") as f:
+            contents = f.read()  # Only the links are decoded, not the whole page
+            links = [link.decode() for link in LINK_RE.findall(contents)]
             pages[filename] = set(links) - {filename}
 
     # Only include links to other pages in the corpus
+    keyset = set(pages)
     for filename in pages:
-        pages[filename] = set(
-            link for link in pages[filename]
-            if link in pages
-        )
+        pages[filename] &= keyset
 
     return pages
 
@@ -88,28 +92,121 @@ def sample_pagerank(corpus, damping_factor, n):
     PageRank values should sum to 1.
     """
 
-    s_dict = corpus.copy()
-    for i in s_dict:  # Prepares a dictionary witth zero samples
-        s_dict[i] = 0
-    sample = None  
+    # The transition model only depends on the current page, so it is
+    # computed once per page as cumulative weights over `pages`
+    pages = tuple(corpus)
+    cum_weights = []
+    for page in pages:
+        d = transition_model(corpus, page, damping_factor)
+        cum_weights.append(list(itertools.accumulate(d[i] for i in pages)))
 
-    for a in range(n):
-        if sample:  # If a previous sample is available this will choose using transition model
-            d = transition_model(corpus, sample, damping_factor)
-            d_list = list(d.keys())
-            d_weights = [d[i] for i in d]
-            sample = random.choices(d_list, d_weights, k=1)[0]
-        else:
-            sample = random.choice(list(corpus.keys()))  # If there is no previous sample, it will choose randomly
+    counts = [0] * len(pages)  # Prepares a list witth zero samples per page
+    sample = random.randrange(len(pages))  # There is no previous sample, so it is chosen randomly
+    counts[sample] += 1
 
-        s_dict[sample] += 1  # This counts each sample
+    # Draws the random numbers for all the other samples at once, then
+    # follows the transition model by searching each one in the cumulative weights
+    for x in [random.random() for _ in range(n - 1)]:
+        weights = cum_weights[sample]
+        sample = bisect.bisect(weights, x * weights[-1], 0, len(weights) - 1)  # Rounding can never pick past the last page
+        counts[sample] += 1  # This counts each sample
 
-    for i in s_dict:
-        s_dict[i] /= n  # This turns samples counts to percentages
+    s_dict = {page: counts[i] / n for i, page in enumerate(pages)}  # This turns samples counts to percentages
 
     return s_dict  # Returns the page rank values
 
 
+def corpus_arrays(corpus):
+    """
+    Return the links of `corpus` as flat parallel lists, with pages
+    numbered in sorted order.
+    Returns `(pages, out_indptr, out_indices, out_deg, dangling)`: page `i`
+    is `pages[i]`, it links to the pages
+    `out_indices[out_indptr[i]:out_indptr[i + 1]]`, and has `out_deg[i]`
+    links. `dangling[i]` is True if page `i` has no links at all.
+    """
+    pages = sorted(corpus)
+    index = {page: i for i, page in enumerate(pages)}
+
+    out_indptr = [0]
+    out_indices = []
+    for page in pages:
+        out_indices.extend(sorted(index[link] for link in corpus[page]))
+        out_indptr.append(len(out_indices))
+
+    out_deg = [out_indptr[i + 1] - out_indptr[i] for i in range(len(pages))]
+    dangling = [deg == 0 for deg in out_deg]
+    return pages, out_indptr, out_indices, out_deg, dangling
+
+
+def incoming_links(corpus):
+    """
+    Return the pages linking to every page of `corpus`.
+    Returns `(pages, in_links, out_deg, dangling)`: page `i` is `pages[i]`,
+    `in_links[i]` lists the pages linking to it, and `out_deg[i]` is its
+    number of links. `dangling` lists the pages that have no links at all.
+    """
+    pages, out_indptr, out_indices, out_deg, is_dangling = corpus_arrays(corpus)
+
+    in_links = [[] for _ in pages]  # Walks every link once
+    for page in range(len(pages)):
+        for k in range(out_indptr[page], out_indptr[page + 1]):
+            in_links[out_indices[k]].append(page)
+
+    dangling = [i for i in range(len(pages)) if is_dangling[i]]
+    return pages, in_links, out_deg, dangling
+
+
+def power_iteration(in_links, out_deg, dangling, damping_factor, tolerance):
+    """
+    Return the list of PageRank values of the pages described by
+    `in_links`, `out_deg` and `dangling` (see `incoming_links`), updating
+    them until no value changes by `tolerance` or more.
+    Everything the loop uses is bound to a local name beforehand, so each
+    iteration only does list indexing and float arithmetic.
+    This is plain power iteration on purpose: the transition matrix is not
+    symmetric, so its eigenvalues can lie anywhere in a disc of radius
+    `damping_factor`, and on a disc no polynomial acceleration (such as
+    Chebyshev) converges faster.
+    Ranks are kept as 32-bit floats, so `tolerance` should stay well above
+    their precision (about 1e-7 of a rank).
+    """
+    no_of_pages = len(in_links)
+    linking = [i for i in range(no_of_pages) if out_deg[i]]
+    teleport = (1 - damping_factor) / no_of_pages  # First part of the formula
+
+    # Values are stored as 32-bit floats, which is ample for the tolerance
+    # and halves the memory they take; sums are still done in 64 bits
+    old_ranks = array("f", [1 / no_of_pages]) * no_of_pages  # Giving each page a rank of 1/n, n = no.of in corpus
+    new_ranks = array("f", [0]) * no_of_pages  # The two rank arrays are reused, swapping roles every iteration
+
+    # Damped rank every page passes on through each of its links, so the
+    # damping is applied once per page instead of once per link
+    weights = array("f", [damping_factor / out_deg[i] if out_deg[i] else 0 for i in range(no_of_pages)])
+    shares = array("f", [0]) * no_of_pages
+    share_of = shares.__getitem__
+    dangling_weight = damping_factor / no_of_pages
+
+    while True:  # Repeatedly calculating new rank values basing on all of the current rank values
+        # The part of the formula that is the same for every page: the
+        # teleport and the damped rank of the pages with no links, which link to every page
+        base = teleport + dangling_weight * sum(old_ranks[link_page] for link_page in dangling)
+
+        for link_page in linking:
+            shares[link_page] = old_ranks[link_page] * weights[link_page]
+
+        # Every page only reads the shares of the pages that link to it, 2nd
+        # part of the formula, so all the pages are computed in one pass
+        for page in range(no_of_pages):
+            new_ranks[page] = base + sum(map(share_of, in_links[page]))
+
+        difference = max(abs(new - old) for new, old in zip(new_ranks, old_ranks))
+        if difference < tolerance:  # Checks if the difference is minimal
+            total = sum(old_ranks)
+            return [rank / total for rank in old_ranks]  # Rounding to 32 bits leaves the sum slightly off 1
+        old_ranks, new_ranks = new_ranks, old_ranks
+
+
 def iterate_pagerank(corpus, damping_factor):
     """
     Return PageRank values for each page by iteratively updating
@@ -118,33 +215,9 @@ def iterate_pagerank(corpus, damping_factor):
     their estimated PageRank value (a value between 0 and 1). All
     PageRank values should sum to 1.
     """
-    no_of_pages = len(corpus)
-    old_dictionary = {}
-    new_dictionary = {}  # Declaring two new dictionarys
-
-    for page in corpus:
-        old_dictionary[page] = 1 / no_of_pages # Giving each page a rank of 1/n, n = no.of in corpus
-
-    while True:  # Repeatedly calculating new rank values basing on all of the current rank values
-        for page in corpus:
-            rank = 0
-            for link_page in corpus:
-                if page in corpus[link_page]:  # Checking if page has links to our page
-                    rank += (old_dictionary[link_page] / len(corpus[link_page]))  # Caluculates if our page has the same links as other pages, 2nd part of the formula
-                if len(corpus[link_page]) == 0:  # if page has no links we take it as having one link for every other page
-                    rank += (old_dictionary[link_page]) / len(corpus)
-            rank *= damping_factor
-            rank += (1 - damping_factor) / no_of_pages  # First part of the formula
-
-            new_dictionary[page] = rank
-
-        difference = max([abs(new_dictionary[y] - old_dictionary[y]) for y in old_dictionary])
-        if difference < 0.001:  # Checks if the difference is minimal
-            break
-        else:
-            old_dictionary = new_dictionary.copy()
-
-    return old_dictionary
+    pages, in_links, out_deg, dangling = incoming_links(corpus)
+    ranks = power_iteration(in_links, out_deg, dangling, damping_factor, 0.001)
+    return dict(zip(pages, ranks))
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
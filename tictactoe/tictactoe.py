@@ -2,21 +2,31 @@
 Tic Tac Toe Player
 """
 
+import functools
 import math
-from copy import deepcopy
 
 X = "X"
 O = "O"
 EMPTY = None
 
+# Order in which moves are tried, strongest positions first
+ORDER = ((1, 1),
+         (0, 0), (0, 2), (2, 0), (2, 2),
+         (0, 1), (1, 0), (1, 2), (2, 1))
+
+# Bitmasks of the 8 winning lines, where cell (i, j) is bit i * 3 + j
+LINES = (0o007, 0o070, 0o700,  # Rows
+         0o111, 0o222, 0o444,  # Columns
+         0o421, 0o124)  # Diagonals
+
 
 def initial_state():
     """
     Returns starting state of the board.
     """
-    return [[EMPTY, EMPTY, EMPTY],
-            [EMPTY, EMPTY, EMPTY],
-            [EMPTY, EMPTY, EMPTY]]
+    return ((EMPTY, EMPTY, EMPTY),
+            (EMPTY, EMPTY, EMPTY),
+            (EMPTY, EMPTY, EMPTY))
 
 
 def player(board):
@@ -38,65 +48,85 @@ def player(board):
 
 def actions(board):
     """
-    Returns set of all possible actions (i, j) available on the board.
+    Returns list of all possible actions (i, j) available on the board,
+    in a fixed order: center first, then corners, then edges.
     """
-
-    possible_moves = set()  # Initializes a set to store the possible moves 
-    for row in range(len(board)):  
-        for col in range(len(board)):  # Loops over board
-            if board[row][col] == EMPTY:  # Checks if a box/position is empty
-                possible_moves.add((row, col))  # If the position is Empty it gets added to the set possible moves
-
-    return possible_moves
+    return [(row, col) for (row, col) in ORDER if board[row][col] == EMPTY]  # Only the empty positions
 
 
 def result(board, action):
     """
     Returns the board that results from making move (i, j) on the board.
     """
+    board = tuple(map(tuple, board))  # Boards given as lists of lists are turned into tuples
     move_by_player = player(board)  # Storing the player move
-    new_board = deepcopy(board)  # Making a deep copy of the board
     (i, j) = action
     if board[i][j] != None:  # Checking if the move is valid
         raise Exception
     else:
-        new_board[i][j] = move_by_player  # Adding the move to the new board
+        row = board[i][:j] + (move_by_player,) + board[i][j + 1:]  # Adding the move to a new row
+        new_board = board[:i] + (row,) + board[i + 1:]  # Boards are tuples, so only the changed row is rebuilt
 
     return new_board
 
 
+def board_bits(board):
+    """
+    Returns the cells taken by X and by O as two 9-bit masks.
+    """
+    x_bits = 0
+    o_bits = 0
+    for i in range(3):
+        for j in range(3):
+            if board[i][j] == X:
+                x_bits |= 1 << (i * 3 + j)
+            elif board[i][j] == O:
+                o_bits |= 1 << (i * 3 + j)
+    return x_bits, o_bits
+
+
+def winner_bits(x_bits, o_bits):
+    """
+    Returns the winner of the game given the bitmasks of X and O, if there is one.
+    """
+    for line in LINES:
+        if x_bits & line == line:  # Checks if X fills the whole line
+            return X
+        if o_bits & line == line:  # Checks if O fills the whole line
+            return O
+    return None
+
+
 def winner(board):
     """
     Returns the winner of the game, if there is one.
     """
-    for player in (X, O):
-            for row in board:
-                if row == [player] * 3:  # Checks horizontally to see if a row is filled
-                    return player
+    return _winner(tuple(map(tuple, board)))  # The cache needs boards as tuples
 
-            for i in range(3):
-                column = [board[x][i] for x in range(3)]
-                if column == [player] * 3:  # Checks vertically to see if a row is filled
-                    return player
 
-            if [board[i][i] for i in range(0, 3)] == [player] * 3:
-                return player
+@functools.lru_cache(maxsize=None)
+def _winner(board):
+    """
+    Returns the winner of a board given as tuples, cached per board.
+    """
+    return winner_bits(*board_bits(board))
 
-            elif [board[i][~i] for i in range(0, 3)] == [player] * 3:  # Checks diagonally to see if a row is filled
-                return player
-    return None
-                               
 
 def terminal(board):
     """
     Returns True if game is over, False otherwise.
     """
-    if winner(board) != None:  # Returns true if someone wins
-        return True
-    for row in board:  # Returns False if there are still moves to play
-        if EMPTY in row:
-            return False
-    return True  # Returns true if no possible moves are remaining
+    return _terminal(tuple(map(tuple, board)))  # The cache needs boards as tuples
+
+
+@functools.lru_cache(maxsize=None)
+def _terminal(board):
+    """
+    Returns True if the game on a board given as tuples is over, cached per board.
+    """
+    x_bits, o_bits = board_bits(board)
+    # Returns true if someone wins or if no possible moves are remaining
+    return winner_bits(x_bits, o_bits) is not None or x_bits | o_bits == 0o777
 
 
 def utility(board):
@@ -113,42 +143,66 @@ def utility(board):
         return 0  # Returns 0 if no one wins
 
 
-def minimax(board):
+@functools.lru_cache(maxsize=None)
+def _max_value(board, alpha=-2, beta=2):
     """
-    Returns the optimal action for the current player on the board.
+    Returns the best value X can reach from the board, and the move to
+    get it. Boards are immutable, so results are cached per board.
+    Moves that O would never allow, i.e. values of `beta` or more, are cut
+    off; values are only exact between `alpha` and `beta`.
     """
+    best_move = ()
+    if _terminal(board):
+        return utility(board), best_move
+    else:
+        v = -5
+        for action in actions(board):
+            minval = _min_value(result(board, action), alpha, beta)[0]
+            if minval > v:
+                v = minval
+                best_move = action
+            if v >= beta:  # O already has a better option elsewhere
+                return v, best_move
+            if v > alpha:
+                alpha = v
+        return v, best_move
+
+
+@functools.lru_cache(maxsize=None)
+def _min_value(board, alpha=-2, beta=2):
+    """
+    Returns the best value O can reach from the board, and the move to
+    get it. Boards are immutable, so results are cached per board.
+    Moves that X would never allow, i.e. values of `alpha` or less, are cut
+    off; values are only exact between `alpha` and `beta`.
+    """
+    best_move = ()
+    if _terminal(board):
+        return utility(board), best_move
+    else:
+        v = 5
+        for action in actions(board):
+            maxval = _max_value(result(board, action), alpha, beta)[0]
+            if maxval < v:
+                v = maxval
+                best_move = action
+            if v <= alpha:  # X already has a better option elsewhere
+                return v, best_move
+            if v < beta:
+                beta = v
+        return v, best_move
 
-    def max(board):
-        best_move = ()
-        if terminal(board):
-            return utility(board), best_move
-        else:
-            v = -5
-            for action in actions(board):
-                minval = min(result(board, action))[0]
-                if minval > v:
-                    v = minval
-                    best_move = action
-            return v, best_move
-
-    def min(board):
-        best_move = ()
-        if terminal(board):
-            return utility(board), best_move
-        else:
-            v = 5
-            for action in actions(board):
-                maxval = max(result(board, action))[0]
-                if maxval < v:
-                    v = maxval
-                    best_move = action
-            return v, best_move
 
+def minimax(board):
+    """
+    Returns the optimal action for the current player on the board.
+    """
+    board = tuple(map(tuple, board))  # The cache needs boards as tuples
     now_playing = player(board)
 
-    if terminal(board):
+    if _terminal(board):
         return None
     if now_playing == X:
-        return max(board)[1]
+        return _max_value(board, -2, 2)[1]
     else:
-        return min(board)[1]
\ No newline at end of file
+        return _min_value(board, -2, 2)[1]
\ No newline at end of file